@@ -81,6 +81,33 @@ def _get_output_shapes(dataset):
   """
   return tf.nest.map_structure(lambda spec: spec.shape, dataset.element_spec)
 
+def _make_dataset_options(deterministic=True):
+  """Returns the options applied to the training and inference pipelines.
+
+  Args:
+    deterministic: If ``False``, elements may be produced out of order.
+
+  Returns:
+    A ``tf.data.Options`` instance.
+  """
+  options = tf.data.Options()
+  options.experimental_deterministic = deterministic
+  optimization = options.experimental_optimization
+  optimization.apply_default_optimizations = True
+  optimization.autotune = True
+  optimization.noop_elimination = True
+  optimization.map_and_batch_fusion = True
+  optimization.map_fusion = True
+  # The length filter only reads the processed features so it can be fused
+  # with the processing function.
+  optimization.filter_fusion = True
+  optimization.map_and_filter_fusion = True
+  # Let the autotuner also size the prefetch buffers that are not set explicitly.
+  # This option is not available in all supported TensorFlow versions.
+  if hasattr(optimization, "autotune_buffers"):
+    optimization.autotune_buffers = True
+  return options
+
 def get_dataset_size(dataset, batch_size=5000):
   """Get the dataset size.
 
@@ -161,30 +188,29 @@ def filter_examples_by_length(maximum_features_length=None,
   if features_length_fn is None and labels_length_fn is None:
     return lambda dataset: dataset
 
-  def _length_constraints(length, maximum_length):
+  def _add_length_constraints(cond, length, maximum_length):
     # Work with lists of lengths which correspond to the general multi source case.
     if not isinstance(length, list):
       length = [length]
     if not isinstance(maximum_length, list):
       maximum_length = [maximum_length]
     # Unset maximum lengths are set to None (i.e. no constraint).
-    maximum_length += [None] * (len(length) - len(maximum_length))
-    constraints = []
+    maximum_length = maximum_length + [None] * (len(length) - len(maximum_length))
     for l, maxlen in zip(length, maximum_length):
-      constraints.append(tf.greater(l, 0))
+      cond = tf.logical_and(cond, tf.greater(l, 0))
       if maxlen is not None:
-        constraints.append(tf.less_equal(l, maxlen))
-    return constraints
+        cond = tf.logical_and(cond, tf.less_equal(l, maxlen))
+    return cond
 
   def _predicate(features, labels):
-    cond = []
+    cond = tf.constant(True)
     features_length = features_length_fn(features) if features_length_fn is not None else None
     labels_length = labels_length_fn(labels) if labels_length_fn is not None else None
     if features_length is not None:
-      cond.extend(_length_constraints(features_length, maximum_features_length))
+      cond = _add_length_constraints(cond, features_length, maximum_features_length)
     if labels_length is not None:
-      cond.extend(_length_constraints(labels_length, maximum_labels_length))
-    return tf.reduce_all(cond)
+      cond = _add_length_constraints(cond, labels_length, maximum_labels_length)
+    return cond
 
   return lambda dataset: dataset.filter(_predicate)
 
@@ -241,7 +267,7 @@ def make_cardinality_multiple_of(divisor):
 
   return _transform
 
-def random_shard(shard_size, dataset_size):
+def random_shard(shard_size, dataset_size, seed=None):
   """Transformation that shards the dataset in a random order.
 
   Example:
@@ -254,6 +280,8 @@ def random_shard(shard_size, dataset_size):
   Args:
     shard_size: The number of examples in each shard.
     dataset_size: The total number of examples in the dataset.
+    seed: The random seed to shuffle the shards. If ``None``, the seed is
+      derived from the global random seed.
 
   Returns:
     A ``tf.data.Dataset`` transformation.
@@ -263,14 +291,14 @@ def random_shard(shard_size, dataset_size):
 
   def _random_shard(dataset):
     sharded_dataset = tf.data.Dataset.from_tensor_slices(offsets)
-    sharded_dataset = sharded_dataset.shuffle(num_shards)
+    sharded_dataset = sharded_dataset.shuffle(num_shards, seed=seed)
     sharded_dataset = sharded_dataset.flat_map(
         lambda offset: dataset.skip(offset).take(shard_size))
     return sharded_dataset
 
   return _random_shard
 
-def shuffle_dataset(buffer_size, shuffle_shards=True):
+def shuffle_dataset(buffer_size, shuffle_shards=True, seed=None):
   """Transformation that shuffles the dataset based on its size.
 
   Example:
@@ -285,10 +313,15 @@ def shuffle_dataset(buffer_size, shuffle_shards=True):
     shuffle_shards: When :obj:`buffer_size` is smaller than the dataset size,
       the dataset is first sharded in a random order to add another level of
       shuffling.
+    seed: The random seed to shuffle the dataset. A distinct seed is derived
+      from it to shuffle the shards. If ``None``, the seeds are derived from
+      the global random seed.
 
   Returns:
     A ``tf.data.Dataset`` transformation.
   """
+  # Shuffle operations with the same seed produce the same random sequence.
+  shard_seed = seed + 1 if seed is not None else None
 
   def _shuffle(dataset):
     sample_size = buffer_size
@@ -298,13 +331,33 @@ def shuffle_dataset(buffer_size, shuffle_shards=True):
       if sample_size < 0:
         sample_size = dataset_size
       elif sample_size < dataset_size:
-        dataset = dataset.apply(random_shard(sample_size, dataset_size))
-    dataset = dataset.shuffle(sample_size)
+        dataset = dataset.apply(random_shard(sample_size, dataset_size, seed=shard_seed))
+    dataset = dataset.shuffle(sample_size, seed=seed)
     return dataset
 
   return _shuffle
 
-def batch_dataset(batch_size, padded_shapes=None):
+def _pad_to_multiple(tensor, shape, multiple):
+  """Pads the time dimension of a batched tensor to a multiple of :obj:`multiple`.
+
+  Args:
+    tensor: The batched tensor.
+    shape: The static shape of the batch, as a ``tf.TensorShape``.
+    multiple: The value that should divide the padded dimension.
+
+  Returns:
+    The padded tensor.
+  """
+  shape = shape.as_list()
+  # Only pad the time dimension when its size is unknown.
+  if len(shape) < 2 or shape[1] is not None:
+    return tensor
+  length = tf.shape(tensor)[1]
+  paddings = [[0, 0] for _ in shape]
+  paddings[1][1] = (multiple - length % multiple) % multiple
+  return tf.pad(tensor, paddings, constant_values=tf.zeros([], dtype=tensor.dtype))
+
+def batch_dataset(batch_size, padded_shapes=None, pad_to_multiple=1):
   """Transformation that batches a dataset.
 
   Example:
@@ -315,6 +368,10 @@ def batch_dataset(batch_size, padded_shapes=None):
     batch_size: The batch size.
     padded_shapes: The padded shapes for this dataset. If ``None``, the shapes
       are automatically inferred from the dataset output shapes.
+    pad_to_multiple: Pad the time dimension (the second dimension, when its
+      size is unknown) to a multiple of this value. This bounds the number of
+      distinct batch shapes, which can reduce the kernels selection and memory
+      reallocation overhead on GPU.
 
   Returns:
     A ``tf.data.Dataset`` transformation.
@@ -322,8 +379,19 @@ def batch_dataset(batch_size, padded_shapes=None):
   See Also:
     :func:`opennmt.data.batch_sequence_dataset`
   """
-  return lambda dataset: dataset.padded_batch(
-      batch_size, padded_shapes=padded_shapes or _get_output_shapes(dataset))
+
+  def _batch(dataset):
+    dataset = dataset.padded_batch(
+        batch_size, padded_shapes=padded_shapes or _get_output_shapes(dataset))
+    if pad_to_multiple > 1:
+      shapes = _get_output_shapes(dataset)
+      dataset = dataset.map(lambda *x: tf.nest.map_structure(
+          lambda tensor, shape: _pad_to_multiple(tensor, shape, pad_to_multiple),
+          misc.item_or_tuple(x),
+          shapes))
+    return dataset
+
+  return _batch
 
 def batch_sequence_dataset(batch_size,
                            batch_type="examples",
@@ -331,7 +399,8 @@ def batch_sequence_dataset(batch_size,
                            batch_size_multiple=1,
                            length_bucket_width=None,
                            length_fn=None,
-                           padded_shapes=None):
+                           padded_shapes=None,
+                           pad_to_multiple=1):
   """Transformation that batches a dataset of sequences.
 
   This implements an example-based and a token-based batching strategy
@@ -367,6 +436,8 @@ def batch_sequence_dataset(batch_size,
       that take features as argument and return the associated sequence length.
     padded_shapes: The padded shapes for this dataset. If ``None``, the shapes
       are automatically inferred from the dataset output shapes.
+    pad_to_multiple: Pad the time dimension (the second dimension, when its
+      size is unknown) to a multiple of this value.
 
   Returns:
     A ``tf.data.Dataset`` transformation.
@@ -381,17 +452,15 @@ def batch_sequence_dataset(batch_size,
   """
   batch_size = batch_size * batch_multiplier
 
-  def _get_bucket_id(features, length_fn):
-    default_id = tf.constant(0, dtype=tf.int32)
+  def _get_lengths(features, length_fn):
     if length_fn is None:
-      return default_id
+      return []
     lengths = length_fn(features)
     if lengths is None:
-      return default_id
+      return []
     if not isinstance(lengths, list):
       lengths = [lengths]  # Fallback to the general case of parallel inputs.
-    lengths = [length // length_bucket_width for length in lengths]
-    return tf.reduce_max(lengths)
+    return lengths
 
   def _key_func(*args):
     length_fns = length_fn
@@ -402,26 +471,36 @@ def batch_sequence_dataset(batch_size,
     if len(length_fns) != len(args):
       raise ValueError("%d length functions were passed but this dataset contains "
                        "%d parallel elements" % (len(length_fns), len(args)))
-    # Take the highest bucket id.
-    bucket_id = tf.reduce_max([
-        _get_bucket_id(features, length_fn)
-        for features, length_fn in zip(args, length_fns)])
-    return tf.cast(bucket_id, tf.int64)
+    lengths = []
+    for features, fn in zip(args, length_fns):
+      lengths.extend(_get_lengths(features, fn))
+    if not lengths:
+      return tf.constant(0, dtype=tf.int64)
+    # Take the bucket of the highest length: this only requires a single division.
+    max_length = lengths[0] if len(lengths) == 1 else tf.reduce_max(lengths)
+    return tf.cast(max_length // length_bucket_width, tf.int64)
 
   def _reduce_func(unused_key, dataset):
-    return dataset.apply(batch_dataset(batch_size, padded_shapes=padded_shapes))
+    return dataset.apply(batch_dataset(
+        batch_size, padded_shapes=padded_shapes, pad_to_multiple=pad_to_multiple))
 
   def _window_size_func(key):
     if length_bucket_width > 1:
       key += 1  # For length_bucket_width == 1, key 0 is unassigned.
-    size = batch_size // (key * length_bucket_width)
+    length = key * length_bucket_width
+    if pad_to_multiple > 1:
+      # The batch will be padded so count the padding positions in the budget.
+      length = -(-length // pad_to_multiple) * pad_to_multiple
+    size = batch_size // length
     required_multiple = batch_multiplier * batch_size_multiple
     if required_multiple > 1:
-      size = size + required_multiple - size % required_multiple
+      # Round down so that the batch does not exceed the tokens budget.
+      size -= size % required_multiple
     return tf.cast(tf.maximum(size, required_multiple), tf.int64)
 
   if length_bucket_width is None:
-    return batch_dataset(batch_size, padded_shapes=padded_shapes)
+    return batch_dataset(
+        batch_size, padded_shapes=padded_shapes, pad_to_multiple=pad_to_multiple)
 
   if batch_type == "examples":
     return tf.data.experimental.group_by_window(
@@ -450,11 +529,15 @@ def training_pipeline(batch_size,
                       num_threads=None,
                       shuffle_buffer_size=None,
                       prefetch_buffer_size=None,
-                      cardinality_multiple=1):
+                      cardinality_multiple=1,
+                      cache_path=None,
+                      pad_to_multiple=1,
+                      seed=None):
   """Transformation that applies most of the dataset operations commonly used
   for training on sequence data:
 
   * sharding
+  * caching
   * shuffling
   * processing
   * filtering
@@ -486,12 +569,23 @@ def training_pipeline(batch_size,
     num_shards: The number of data shards (usually the number of workers in a
       distributed setting).
     shard_index: The shard index this data pipeline should read from.
-    num_threads: The number of elements processed in parallel.
+    num_threads: The number of elements processed in parallel. If ``None``, use
+      an automatically tuned value.
     shuffle_buffer_size: The number of elements from which to sample.
     prefetch_buffer_size: The number of batches to prefetch asynchronously. If
       ``None``, use an automatically tuned value.
     cardinality_multiple: Ensure that the dataset cardinality is a multiple of
       this value when :obj:`single_pass` is ``True``.
+    cache_path: If set, cache the dataset elements in this file the first time
+      they are read. Set an empty string to cache them in memory. The cache is
+      filled before shuffling so that the order still changes on each epoch.
+      An existing cache is reused as-is, so the cache files should be deleted
+      when the training data changes.
+    pad_to_multiple: Pad the sequences in a batch to a length that is a
+      multiple of this value.
+    seed: The random seed from which the sampling and shuffling seeds are
+      derived. When set, the elements are also produced in a deterministic
+      order.
 
   Returns:
     A ``tf.data.Dataset`` transformation.
@@ -504,6 +598,20 @@ def training_pipeline(batch_size,
     - :func:`opennmt.data.shuffle_dataset`
   """
 
+  def _cache_dataset(dataset, index=None):
+    if cache_path is None:
+      return dataset
+    filename = cache_path
+    if filename:
+      if num_shards > 1:
+        filename = "%s.shard%d" % (filename, shard_index)
+      if index is not None:
+        filename = "%s.%d" % (filename, index)
+      if tf.io.gfile.exists("%s.index" % filename):
+        tf.get_logger().warning("Reusing the training data cached in %s. Delete the cache "
+                                "files if the training data changed.", filename)
+    return dataset.cache(filename)
+
   def _make_weighted_dataset(datasets, weights):
     if single_pass:
       raise ValueError("single_pass parameter is not compatible with weighted datasets")
@@ -514,20 +622,26 @@ def training_pipeline(batch_size,
                        "number of data files" % (len(weights), len(datasets)))
     if num_shards > 1:
       datasets = [dataset.shard(num_shards, shard_index) for dataset in datasets]
+    datasets = [_cache_dataset(dataset, index=i) for i, dataset in enumerate(datasets)]
     weights = normalize_weights(datasets, weights=weights)
     datasets = [dataset.repeat() for dataset in datasets]
-    dataset = tf.data.experimental.sample_from_datasets(datasets, weights=weights)
+    dataset = tf.data.experimental.sample_from_datasets(datasets, weights=weights, seed=seed)
     if shuffle_buffer_size is not None and shuffle_buffer_size != 0:
       if shuffle_buffer_size < 0:
         raise ValueError("shuffle_buffer_size < 0 is not compatible with weighted datasets")
-      dataset = dataset.shuffle(shuffle_buffer_size)
+      dataset = dataset.shuffle(
+          shuffle_buffer_size, seed=seed + 1 if seed is not None else None)
     return dataset
 
   def _make_single_dataset(dataset):
     if num_shards > 1:
       dataset = dataset.shard(num_shards, shard_index)
+    dataset = _cache_dataset(dataset)
     if shuffle_buffer_size is not None and shuffle_buffer_size != 0:
-      dataset = dataset.apply(shuffle_dataset(shuffle_buffer_size))
+      dataset = dataset.apply(shuffle_dataset(shuffle_buffer_size, seed=seed))
+    if not single_pass:
+      # Repeat right after shuffling so that both operations can be fused.
+      dataset = dataset.repeat()
     return dataset
 
   def _pipeline(dataset):
@@ -541,7 +655,8 @@ def training_pipeline(batch_size,
     else:
       dataset = _make_single_dataset(dataset)
     if process_fn is not None:
-      dataset = dataset.map(process_fn, num_parallel_calls=num_threads or 4)
+      dataset = dataset.map(
+          process_fn, num_parallel_calls=num_threads or tf.data.experimental.AUTOTUNE)
     dataset = dataset.apply(filter_examples_by_length(
         maximum_features_length=maximum_features_length,
         maximum_labels_length=maximum_labels_length,
@@ -553,14 +668,15 @@ def training_pipeline(batch_size,
         batch_multiplier=batch_multiplier,
         batch_size_multiple=batch_size_multiple,
         length_bucket_width=length_bucket_width,
-        length_fn=[features_length_fn, labels_length_fn]))
+        length_fn=[features_length_fn, labels_length_fn],
+        pad_to_multiple=pad_to_multiple))
     dataset = dataset.apply(filter_irregular_batches(batch_multiplier))
-    if not single_pass:
-      if not is_weighted_dataset:  # Weighted dataset is repeated before sampling.
-        dataset = dataset.repeat()
-    else:
+    if single_pass:
       dataset = dataset.apply(make_cardinality_multiple_of(cardinality_multiple))
     dataset = dataset.prefetch(prefetch_buffer_size)
+    # Unless the run should be reproducible, the training order does not need to be
+    # preserved so processed elements can be returned as soon as they are ready.
+    dataset = dataset.with_options(_make_dataset_options(deterministic=seed is not None))
     return dataset
 
   return _pipeline
@@ -586,7 +702,8 @@ def inference_pipeline(batch_size,
       responsible to restore the predictions in order. An "index" key will be
       inserted in the examples dictionary.
     length_fn: A function mapping features to a sequence length.
-    num_threads: The number of elements processed in parallel.
+    num_threads: The number of elements processed in parallel. If ``None``, use
+      an automatically tuned value.
     prefetch_buffer_size: The number of batches to prefetch asynchronously. If
       ``None``, use an automatically tuned value.
 
@@ -599,27 +716,33 @@ def inference_pipeline(batch_size,
       output a dictionary structure.
   """
 
-  def _inject_index(index, x):
+  def _process_and_inject_index(index, x):
+    # Process the element and inject its index in the same function to avoid an
+    # additional map transformation.
+    if process_fn is not None:
+      x = process_fn(*x) if isinstance(x, tuple) else process_fn(x)
+    if not isinstance(x, dict):
+      raise ValueError("Reordering by length expects dataset elements to be Python dicts")
     x["index"] = index
     return x
 
   def _pipeline(dataset):
-    if process_fn is not None:
-      dataset = dataset.map(process_fn, num_parallel_calls=num_threads)
+    num_parallel_calls = num_threads or tf.data.experimental.AUTOTUNE
     if length_bucket_width is not None and length_bucket_width > 0:
       if length_fn is None:
         raise ValueError("length_fn is required when reordering by length")
-      if not isinstance(_get_output_shapes(dataset), dict):
-        raise ValueError("Reordering by length expects dataset elements to be Python dicts")
       dataset = dataset.enumerate()
-      dataset = dataset.map(_inject_index)
+      dataset = dataset.map(_process_and_inject_index, num_parallel_calls=num_parallel_calls)
       dataset = dataset.apply(batch_sequence_dataset(
           batch_size,
           length_bucket_width=length_bucket_width,
           length_fn=length_fn))
     else:
+      if process_fn is not None:
+        dataset = dataset.map(process_fn, num_parallel_calls=num_parallel_calls)
       dataset = dataset.apply(batch_dataset(batch_size))
     dataset = dataset.prefetch(prefetch_buffer_size)
+    dataset = dataset.with_options(_make_dataset_options())
     return dataset
 
   return _pipeline
@@ -94,9 +94,7 @@ class Evaluator(object):
     dataset = model.examples_inputter.make_evaluation_dataset(
         features_file,
         labels_file,
-        batch_size,
-        num_threads=1,
-        prefetch_buffer_size=1)
+        batch_size)
 
     self._eval_fn = tf.function(model.evaluate, input_signature=dataset.element_spec)
     self._dataset = dataset
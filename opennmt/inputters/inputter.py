@@ -65,7 +65,7 @@ class Inputter(tf.keras.layers.Layer):
                              features_file,
                              batch_size,
                              length_bucket_width=None,
-                             num_threads=1,
+                             num_threads=None,
                              prefetch_buffer_size=None):
     """Builds a dataset to be used for inference.
 
@@ -78,7 +78,8 @@ class Inputter(tf.keras.layers.Layer):
       length_bucket_width: The width of the length buckets to select batch
         candidates from (for efficiency). Set ``None`` to not constrain batch
         formation.
-      num_threads: The number of elements processed in parallel.
+      num_threads: The number of elements processed in parallel. If ``None``,
+        use an automatically tuned value.
       prefetch_buffer_size: The number of batches to prefetch asynchronously. If
         ``None``, use an automatically tuned value.
 
@@ -452,7 +453,7 @@ class ExampleInputter(ParallelInputter):
                              features_file,
                              batch_size,
                              length_bucket_width=None,
-                             num_threads=1,
+                             num_threads=None,
                              prefetch_buffer_size=None):
     return self.features_inputter.make_inference_dataset(
         features_file,
@@ -465,7 +466,7 @@ class ExampleInputter(ParallelInputter):
                               features_file,
                               labels_file,
                               batch_size,
-                              num_threads=1,
+                              num_threads=None,
                               prefetch_buffer_size=None):
     """Builds a dataset to be used for evaluation.
 
@@ -473,7 +474,8 @@ class ExampleInputter(ParallelInputter):
       features_file: The evaluation source file.
       labels_file: The evaluation target file.
       batch_size: The batch size to use.
-      num_threads: The number of elements processed in parallel.
+      num_threads: The number of elements processed in parallel. If ``None``,
+        use an automatically tuned value.
       prefetch_buffer_size: The number of batches to prefetch asynchronously. If
         ``None``, use an automatically tuned value.
 
@@ -506,14 +508,18 @@ class ExampleInputter(ParallelInputter):
                             single_pass=False,
                             num_shards=1,
                             shard_index=0,
-                            num_threads=4,
+                            num_threads=None,
                             prefetch_buffer_size=None,
                             cardinality_multiple=1,
-                            weights=None):
+                            weights=None,
+                            cache_path=None,
+                            pad_to_multiple=1,
+                            seed=None):
     """Builds a dataset to be used for training. It supports the full training
     pipeline, including:
 
     * sharding
+    * caching
     * shuffling
     * filtering
     * bucketing
@@ -541,13 +547,20 @@ class ExampleInputter(ParallelInputter):
       num_shards: The number of data shards (usually the number of workers in a
         distributed setting).
       shard_index: The shard index this data pipeline should read from.
-      num_threads: The number of elements processed in parallel.
+      num_threads: The number of elements processed in parallel. If ``None``,
+        use an automatically tuned value.
       prefetch_buffer_size: The number of batches to prefetch asynchronously. If
         ``None``, use an automatically tuned value.
       cardinality_multiple: Ensure that the dataset cardinality is a multiple of
         this value when :obj:`single_pass` is ``True``.
       weights: An optional list of weights to create a weighted dataset out of
         multiple training files.
+      cache_path: If set, cache the training examples in this file the first
+        time they are read. Set an empty string to cache them in memory.
+      pad_to_multiple: Pad the sequences in a batch to a length that is a
+        multiple of this value.
+      seed: The random seed to use for sampling and shuffling. When set, the
+        examples are also produced in a deterministic order.
 
     Returns:
       A ``tf.data.Dataset``.
@@ -576,5 +589,8 @@ class ExampleInputter(ParallelInputter):
         num_threads=num_threads,
         shuffle_buffer_size=shuffle_buffer_size,
         prefetch_buffer_size=prefetch_buffer_size,
-        cardinality_multiple=cardinality_multiple)(dataset)
+        cardinality_multiple=cardinality_multiple,
+        cache_path=cache_path,
+        pad_to_multiple=pad_to_multiple,
+        seed=seed)(dataset)
     return dataset
@@ -170,7 +170,7 @@ class LanguageModelInputter(inputters.WordEmbedder):
                              features_file,
                              batch_size,
                              length_bucket_width=None,
-                             num_threads=1,
+                             num_threads=None,
                              prefetch_buffer_size=None):
     dataset = self.make_dataset(features_file, training=False)
     dataset = dataset.apply(dataset_util.inference_pipeline(
@@ -186,7 +186,7 @@ class LanguageModelInputter(inputters.WordEmbedder):
                               features_file,
                               labels_file,
                               batch_size,
-                              num_threads=1,
+                              num_threads=None,
                               prefetch_buffer_size=None):
     """See :meth:`opennmt.inputters.ExampleInputter.make_evaluation_dataset`."""
     _ = labels_file
@@ -212,10 +212,13 @@ class LanguageModelInputter(inputters.WordEmbedder):
                             single_pass=False,
                             num_shards=1,
                             shard_index=0,
-                            num_threads=4,
+                            num_threads=None,
                             prefetch_buffer_size=None,
                             cardinality_multiple=1,
-                            weights=None):
+                            weights=None,
+                            cache_path=None,
+                            pad_to_multiple=1,
+                            seed=None):
     """See :meth:`opennmt.inputters.ExampleInputter.make_training_dataset`."""
     _ = labels_file
     dataset = self.make_dataset(features_file, training=True)
@@ -237,5 +240,8 @@ class LanguageModelInputter(inputters.WordEmbedder):
         num_threads=num_threads,
         shuffle_buffer_size=shuffle_buffer_size,
         prefetch_buffer_size=prefetch_buffer_size,
-        cardinality_multiple=cardinality_multiple)(dataset)
+        cardinality_multiple=cardinality_multiple,
+        cache_path=cache_path,
+        pad_to_multiple=pad_to_multiple,
+        seed=seed)(dataset)
     return dataset
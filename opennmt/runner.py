@@ -65,6 +65,7 @@ class Runner(object):
     self._config = copy.deepcopy(config)
     self._auto_config = auto_config
     self._mixed_precision = mixed_precision
+    self._seed = seed
     if mixed_precision:
       tf.config.optimizer.set_experimental_options({"auto_mixed_precision": True})
     if seed is not None:
@@ -175,7 +176,10 @@ class Runner(object):
         shard_index=input_context.input_pipeline_id,
         prefetch_buffer_size=train_config.get("prefetch_buffer_size"),
         cardinality_multiple=input_context.num_replicas_in_sync,
-        weights=data_config.get("train_files_weights"))
+        weights=data_config.get("train_files_weights"),
+        cache_path=train_config.get("cache_path"),
+        pad_to_multiple=train_config.get("pad_to_multiple") or 1,
+        seed=self._seed)
 
     if with_eval:
       evaluator = evaluation.Evaluator.from_config(model, config)
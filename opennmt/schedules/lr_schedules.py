@@ -97,9 +97,11 @@ class ScheduleWrapper(tf.keras.optimizers.schedules.LearningRateSchedule):
     self.minimum_learning_rate = minimum_learning_rate
 
   def __call__(self, step):
-    # Map the training step to a decay step.
-    step = tf.maximum(step - self.step_start, 0)
-    step //= self.step_duration
+    # Map the training step to a decay step, if configured.
+    if self.step_start > 0:
+      step = tf.maximum(step - self.step_start, 0)
+    if self.step_duration > 1:
+      step //= self.step_duration
     learning_rate = self.schedule(step)
     return tf.maximum(learning_rate, self.minimum_learning_rate)
 
@@ -176,6 +178,49 @@ class CosineAnnealing(tf.keras.optimizers.schedules.LearningRateSchedule):
     return tf.cond(tf.less(step, self.warmup_steps), true_fn=linear, false_fn=annealing)
 
 
+@register_learning_rate_schedule
+class WarmupStableDecay(tf.keras.optimizers.schedules.LearningRateSchedule):
+  """Defines a warmup-stable-decay schedule: the learning rate is increased
+  linearly, kept constant, and then decayed with a cosine function.
+  """
+
+  def __init__(self,
+               learning_rate,
+               warmup_steps,
+               stable_steps,
+               decay_steps,
+               end_learning_rate=0):
+    """Initializes the decay function.
+
+    Args:
+      learning_rate: The learning rate value of the stable phase.
+      warmup_steps: The number of steps to increment the learning rate linearly
+        from 0 to :obj:`learning_rate`.
+      stable_steps: The number of steps to keep the learning rate constant after
+        the warmup.
+      decay_steps: The number of steps to decay the learning rate from
+        :obj:`learning_rate` to :obj:`end_learning_rate`.
+      end_learning_rate: The final learning rate.
+    """
+    self.learning_rate = tf.cast(learning_rate, tf.float32)
+    self.warmup_steps = tf.cast(warmup_steps, tf.float32)
+    self.decay_start_step = tf.cast(warmup_steps + stable_steps, tf.float32)
+    self.decay_steps = tf.cast(decay_steps, tf.float32)
+    self.end_learning_rate = tf.cast(end_learning_rate, tf.float32)
+
+  def __call__(self, step):
+    step = tf.cast(step, tf.float32)
+    warmup = self.learning_rate * step / tf.maximum(self.warmup_steps, 1)
+    progress = tf.minimum((step - self.decay_start_step) / tf.maximum(self.decay_steps, 1), 1)
+    decay = (
+        self.end_learning_rate
+        + 0.5 * (self.learning_rate - self.end_learning_rate) * (1 + tf.cos(np.pi * progress)))
+    return tf.where(
+        step < self.warmup_steps,
+        warmup,
+        tf.where(step < self.decay_start_step, self.learning_rate, decay))
+
+
 @register_learning_rate_schedule
 class RNMTPlusDecay(tf.keras.optimizers.schedules.LearningRateSchedule):
   """Defines the decay function described in https://arxiv.org/abs/1804.09849."""
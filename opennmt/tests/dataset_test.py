@@ -85,6 +85,16 @@ class DatasetTest(tf.test.TestCase):
     gather = list(iter(dataset))
     self.assertAllEqual(list(range(dataset_size)), sorted(gather))
 
+  def testShuffleDatasetSeed(self):
+    def _shuffle():
+      dataset = tf.data.Dataset.range(100)
+      dataset = dataset.apply(dataset_util.shuffle_dataset(10, seed=42))
+      return list(dataset.as_numpy_iterator())
+
+    elements = _shuffle()
+    self.assertAllEqual(sorted(elements), list(range(100)))
+    self.assertAllEqual(elements, _shuffle())
+
   def _testFilterByLength(self,
                           features_length,
                           labels_length,
@@ -191,6 +201,75 @@ class DatasetTest(tf.test.TestCase):
         self.assertGreaterEqual(256, batch_size * max_length)
     self._testBatchTrainDataset(_check_fn, 256, batch_type="tokens", length_bucket_width=1)
 
+  def testBatchTrainDatasetTokensMultiple(self):
+    # A batch size that is already a multiple should be kept, others should be
+    # rounded down to stay within the tokens budget.
+    for length, expected_batch_size in ((16, 64), (17, 56)):
+      dataset = tf.data.Dataset.from_tensors(length).repeat(200)
+      dataset = dataset.apply(dataset_util.batch_sequence_dataset(
+          1024,
+          batch_type="tokens",
+          batch_size_multiple=8,
+          length_bucket_width=1,
+          length_fn=lambda x: x))
+      batch = next(iter(dataset))
+      self.assertEqual(batch.shape[0], expected_batch_size)
+      self.assertGreaterEqual(1024, batch.shape[0] * length)
+
+  def testBatchDatasetPadToMultiple(self):
+    dataset = tf.data.Dataset.from_tensor_slices([[1, 2, 3], [4, 5, 0]])
+    dataset = dataset.map(lambda x: {"ids": x[:tf.math.count_nonzero(x)], "length": 2})
+    dataset = dataset.apply(dataset_util.batch_dataset(2, pad_to_multiple=4))
+    batch = next(iter(dataset))
+    self.assertAllEqual(batch["ids"], [[1, 2, 3, 0], [4, 5, 0, 0]])
+    self.assertAllEqual(batch["length"], [2, 2])
+
+  def testBatchDatasetPadToMultipleTimeOnly(self):
+    dataset = tf.data.Dataset.from_tensor_slices([3, 2])
+    dataset = dataset.map(lambda x: {
+        "char_ids": tf.ones([x, x], dtype=tf.int32),
+        "tokens": tf.fill([x], "a")})
+    dataset = dataset.apply(dataset_util.batch_dataset(2, pad_to_multiple=4))
+    batch = next(iter(dataset))
+    self.assertAllEqual(batch["char_ids"].shape, [2, 4, 3])
+    self.assertAllEqual(batch["tokens"][1], [b"a", b"a", b"", b""])
+
+  def testBatchTrainDatasetTokensPadToMultiple(self):
+    dataset = tf.data.Dataset.from_tensors(17).repeat(100)
+    dataset = dataset.map(lambda length: tf.ones([length], dtype=tf.int32))
+    dataset = dataset.apply(dataset_util.batch_sequence_dataset(
+        1024,
+        batch_type="tokens",
+        length_bucket_width=1,
+        length_fn=lambda x: tf.shape(x)[0],
+        pad_to_multiple=8))
+    batch = next(iter(dataset))
+    self.assertAllEqual(batch.shape, [42, 24])
+
+  @parameterized.expand([[None], [3]])
+  def testTrainingPipelineCache(self, shuffle_buffer_size):
+    cache_path = os.path.join(self.get_temp_dir(), "cache_%s" % shuffle_buffer_size)
+    dataset = tf.data.Dataset.range(10)
+    dataset = dataset.apply(dataset_util.training_pipeline(
+        5,
+        single_pass=True,
+        shuffle_buffer_size=shuffle_buffer_size,
+        cache_path=cache_path))
+    for _ in range(2):
+      elements = list(iter(dataset))
+      self.assertLen(elements, 2)
+      self.assertAllEqual(tf.sort(tf.concat(elements, 0)), list(range(10)))
+    self.assertNotEmpty(tf.io.gfile.glob("%s*" % cache_path))
+
+  def testTrainingPipelineCacheShards(self):
+    cache_path = os.path.join(self.get_temp_dir(), "cache_shards")
+    dataset = tf.data.Dataset.range(10)
+    dataset = dataset.apply(dataset_util.training_pipeline(
+        5, single_pass=True, num_shards=2, shard_index=1, cache_path=cache_path))
+    elements = list(iter(dataset))
+    self.assertAllEqual(tf.sort(tf.concat(elements, 0)), [1, 3, 5, 7, 9])
+    self.assertNotEmpty(tf.io.gfile.glob("%s.shard1*" % cache_path))
+
   def testReorderInferDataset(self):
     dataset = tf.data.Dataset.from_tensor_slices([8, 2, 5, 6, 7, 1, 3, 9])
     dataset = dataset.map(lambda x: {"length": x})
@@ -208,6 +287,26 @@ class DatasetTest(tf.test.TestCase):
     _check_element(elements[2], [5, 3], [2, 6])
     _check_element(elements[3], [9], [7])
 
+  def testReorderInferDatasetWithProcessing(self):
+    dataset = tf.data.Dataset.from_tensor_slices([8, 2, 5])
+    dataset = dataset.apply(dataset_util.inference_pipeline(
+        2,
+        process_fn=lambda x: {"length": x},
+        length_bucket_width=10,
+        length_fn=lambda x: x["length"]))
+    elements = list(iter(dataset))
+    self.assertEqual(len(elements), 2)
+    self.assertAllEqual(elements[0]["length"], [8, 2])
+    self.assertAllEqual(elements[0]["index"], [0, 1])
+    self.assertAllEqual(elements[1]["length"], [5])
+    self.assertAllEqual(elements[1]["index"], [2])
+
+  def testReorderInferDatasetNotDict(self):
+    dataset = tf.data.Dataset.range(3)
+    with self.assertRaises(ValueError):
+      dataset.apply(dataset_util.inference_pipeline(
+          2, length_bucket_width=1, length_fn=lambda x: x))
+
   def testFunctionOnNext(self):
     dataset = tf.data.Dataset.range(5)
 
@@ -56,6 +56,10 @@ class LRSchedulesTest(tf.test.TestCase):
     self._testNoError(lr_schedules.RsqrtDecay(2.0, 4000))
   def testCosineAnnealing(self):
     self._testNoError(lr_schedules.CosineAnnealing(2.5e-4, max_step=1000000, warmup_steps=4000))
+  def testWarmupStableDecay(self):
+    schedule = lr_schedules.WarmupStableDecay(1.0, 2, 2, 2)
+    values = [schedule(tf.constant(step, dtype=tf.int64)) for step in range(8)]
+    self.assertAllClose(self.evaluate(values), [0, 0.5, 1, 1, 1, 0.5, 0, 0])
   def testRNMTPlusDecay(self):
     self._testNoError(lr_schedules.RNMTPlusDecay(1.0, 2))
 
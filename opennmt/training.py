@@ -6,6 +6,7 @@ import time
 
 import tensorflow as tf
 
+from opennmt.data import dataset as dataset_util
 from opennmt.optimizers import utils as optimizer_util
 from opennmt.utils import misc
 
@@ -198,16 +199,18 @@ class BasicTrainer(Trainer):
     if callable(dataset):
       dataset = dataset(tf.distribute.InputContext())
 
-    @tf.function(input_signature=dataset.element_spec)
-    def _step(source, target):
+    # Get the next element within the tf.function for more pipelining.
+    @dataset_util.function_on_next(dataset)
+    def _step(next_fn):
+      source, target = next_fn()
       training_loss, reported_loss = self._run_model(source, target)
       variables = self._model.trainable_variables
       gradients = self._optimizer.get_gradients(training_loss, variables)
       self._optimizer.apply_gradients(list(zip(gradients, variables)))
       return reported_loss
 
-    for source, target in dataset:
-      yield _step(source, target)
+    for loss in _step():
+      yield loss
 
 
 class DistributionStrategyTrainer(Trainer):